@@ -244,6 +244,7 @@ class StorageMetadata(BaseModel):
     duration: Optional[int] = Field(None, ge=0)
     format: StorageFormat = Field(default=StorageFormat.MP4)
     checksum: Optional[str] = Field(None)
+    checksumAlgorithm: Optional[str] = Field(None)
     tags: List[str] = Field(default_factory=list)
     processingStatus: ProcessingStatus = Field(default=ProcessingStatus.NEW)
     downloadJobId: Optional[str] = Field(None)
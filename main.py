@@ -18,6 +18,11 @@ from datetime import datetime
 from pathlib import Path
 from typing import Optional, Dict, Any
 
+try:
+    import uvloop  # libuv event loop, not available on Windows
+except ImportError:
+    uvloop = None
+
 # Set UTF-8 encoding for stdout/stderr on Windows
 if os.name == 'nt':  # Windows
     import codecs
@@ -763,6 +768,8 @@ Examples:
 
 def run():
     """Synchronous wrapper for async main"""
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     asyncio.run(main())
 
 
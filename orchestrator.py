@@ -706,7 +706,7 @@ class FikFapScraperOrchestrator:
         self.logger.info("[DISK] Saving system state...")
         
         try:
-            await self.metadata_handler.save_processed_posts_cache()
+            await self.metadata_handler.flush()
         except Exception as e:
             self.logger.error(f"Error saving system state: {e}")
     
@@ -3,17 +3,27 @@ File Manager for FikFap Scraper - Phase 4
 Advanced file system operations with atomic operations and proper error handling
 """
 import asyncio
-import aiofiles
+import errno
+import os
 import shutil
 import json
 import hashlib
+import mmap
 import time
 from pathlib import Path
-from typing import Optional, Dict, Any, List, Union, Tuple
+from typing import Optional, Dict, Any, List, Set, Union, Tuple
 from datetime import datetime
 import uuid
+from collections import defaultdict
+from functools import lru_cache
 import tempfile
 import re
+import string
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 from core.config import config
 from core.exceptions import *
@@ -21,6 +31,43 @@ from data.models import VideoPost, StorageMetadata, DirectoryStructure, CleanupS
 from utils.logger import setup_logger
 from utils.helpers import sanitize_filename, format_bytes
 
+# Buffer size for chunked file reads (hashing fallback, fused copy+hash)
+IO_BUFFER_SIZE = 1024 * 1024
+
+# Files smaller than this are hashed through mmap instead of chunked reads
+MMAP_CHECKSUM_THRESHOLD = 256 * 1024 * 1024
+
+# Extensions left behind by interrupted storage operations and downloads
+TEMP_FILE_RE = re.compile(r'\.(?:tmp|partial|downloading)\Z')
+
+# Variables available to storage.filename_template
+FILENAME_TEMPLATE_FIELDS = frozenset({
+    'title', 'author', 'postId', 'quality', 'resolution', 'codec', 'date', 'timestamp'
+})
+FALLBACK_FILENAME_TEMPLATE = '{author}_{title}_{quality}'
+
+# Filesystems where copy_file_range clones extents instead of copying bytes
+COW_FILESYSTEMS = frozenset({'btrfs', 'xfs'})
+
+# Runs of two or more dots in a path component
+DOT_RUN_RE = re.compile(r'\.{2,}')
+
+@lru_cache(maxsize=4096)
+def _sanitize_path_component_cached(component: str) -> str:
+    """Sanitize a path component; authors and quality names repeat across posts"""
+    # Use existing sanitize_filename function
+    sanitized = sanitize_filename(component)
+
+    # Additional path-specific sanitization
+    sanitized = DOT_RUN_RE.sub('_', sanitized)  # Prevent directory traversal
+    sanitized = sanitized.strip('.')  # Remove leading/trailing dots
+
+    # Ensure not empty
+    if not sanitized:
+        sanitized = 'unnamed'
+
+    return sanitized
+
 class FileManager:
     """
     Advanced file manager for storage operations
@@ -45,12 +92,61 @@ class FileManager:
         self.filename_template = config.get('storage.filename_template', '{author}_{title}_{resolution}_{postId}')
         self.max_filename_length = config.get('storage.max_filename_length', 200)
         self.sanitize_filenames = config.get('storage.sanitize_filenames', True)
+        self._filename_template = self._prepare_filename_template(self.filename_template)
+        self.verify_checksum = config.get('storage.verify_checksum', False)
+        self.max_parallel_io = config.get('storage.max_parallel_io', 4)
+        self.checksum_algorithm = self._resolve_checksum_algorithm(
+            config.get('storage.checksum_algorithm', 'blake2b')
+        )
 
         # Initialize base directory
         self._ensure_base_directory()
+        self._cow_filesystem = self._detect_cow_filesystem()
+
+        # Base path invariant used on every store
+        self._base_str = os.path.abspath(self.base_path)
 
         self.logger.info(f"FileManager initialized - Base path: {self.base_path}")
 
+    def _prepare_filename_template(self, template: str) -> str:
+        """Parse the filename template once, falling back if it uses unknown variables"""
+        try:
+            fields = {
+                re.split(r'[.\[]', name, maxsplit=1)[0]
+                for _, name, _, _ in string.Formatter().parse(template)
+                if name is not None
+            }
+        except ValueError as e:
+            self.logger.warning(f"Invalid filename template: {e}")
+            return FALLBACK_FILENAME_TEMPLATE
+
+        unknown = fields - FILENAME_TEMPLATE_FIELDS
+        if unknown:
+            self.logger.warning(f"Invalid filename template variable(s): {', '.join(repr(f) for f in sorted(unknown))}")
+            return FALLBACK_FILENAME_TEMPLATE
+
+        return template
+
+    def _resolve_checksum_algorithm(self, algorithm: str) -> str:
+        """Validate the configured checksum algorithm, falling back to blake2b"""
+        if algorithm == 'xxh3':
+            if xxhash is not None:
+                return algorithm
+            self.logger.warning("xxhash is not installed, using blake2b checksums")
+        elif algorithm in hashlib.algorithms_available and hashlib.new(algorithm).digest_size > 0:
+            # Variable-length XOFs (shake_*) report digest_size 0 and need a
+            # length for hexdigest(), so they are rejected here
+            return algorithm
+        else:
+            self.logger.warning(f"Unknown checksum algorithm '{algorithm}', using blake2b")
+        return 'blake2b'
+
+    def _new_checksum_hasher(self):
+        """Create a hash object for the configured checksum algorithm"""
+        if self.checksum_algorithm == 'xxh3':
+            return xxhash.xxh3_64()
+        return hashlib.new(self.checksum_algorithm)
+
     def _ensure_base_directory(self):
         """Ensure base storage directory exists"""
         try:
@@ -67,6 +163,28 @@ class FileManager:
         except Exception as e:
             raise Exception(f"Cannot create or access storage directory: {e}")
 
+    def _detect_cow_filesystem(self) -> bool:
+        """Check whether the storage path is on a reflink-capable (copy-on-write) filesystem"""
+        if not hasattr(os, 'copy_file_range'):
+            return False
+
+        try:
+            base = os.path.realpath(self.base_path)
+            mount_point, fs_type = '', ''
+            with open('/proc/self/mounts') as mounts:
+                for line in mounts:
+                    fields = line.split()
+                    if len(fields) < 3:
+                        continue
+                    candidate = fields[1].replace('\\040', ' ')
+                    prefix = candidate.rstrip('/') + '/'
+                    # Longest matching mount point wins
+                    if (base == candidate or base.startswith(prefix)) and len(candidate) > len(mount_point):
+                        mount_point, fs_type = candidate, fields[2]
+            return fs_type in COW_FILESYSTEMS
+        except OSError:
+            return False
+
     async def create_directory_structure(self, video_post: VideoPost) -> DirectoryStructure:
         """
         Create organized directory structure for a video post
@@ -102,10 +220,12 @@ class FileManager:
             m3u8_path = post_path / "m3u8"
 
             # Quality-specific subdirectories
-            quality_paths = {}
-            for quality in video_post.availableQualities:
-                quality_dir = self._sanitize_path_component(f"{quality.resolution}_{quality.codec.value}")
-                quality_paths[quality.resolution] = str(m3u8_path / quality_dir)
+            sanitize = self._sanitize_path_component
+            m3u8_dir = os.fspath(m3u8_path)
+            quality_paths = {
+                quality.resolution: os.path.join(m3u8_dir, sanitize(f"{quality.resolution}_{quality.codec.value}"))
+                for quality in video_post.availableQualities
+            }
 
             # Metadata path
             metadata_path = post_path / "metadata.json"
@@ -113,13 +233,13 @@ class FileManager:
             # Create directory structure
             structure = DirectoryStructure(
                 postId=video_post.postId,
-                basePath=str(self.base_path),
-                authorPath=str(author_path) if author_path else None,
-                datePath=str(date_path) if date_path else None,
-                postPath=str(post_path),
-                m3u8Path=str(m3u8_path),
+                basePath=os.fspath(self.base_path),
+                authorPath=os.fspath(author_path) if author_path else None,
+                datePath=os.fspath(date_path) if date_path else None,
+                postPath=os.fspath(post_path),
+                m3u8Path=m3u8_dir,
                 qualityPaths=quality_paths,
-                metadataPath=str(metadata_path)
+                metadataPath=os.fspath(metadata_path)
             )
 
             # Create physical directories
@@ -134,19 +254,28 @@ class FileManager:
 
     async def _create_physical_directories(self, structure: DirectoryStructure):
         """Create physical directory structure"""
-        directories_to_create = [
-            Path(structure.postPath),
-            Path(structure.m3u8Path)
-        ]
+        directories_to_create = {structure.postPath, structure.m3u8Path}
 
         # Add quality directories
-        for quality_path in structure.qualityPaths.values():
-            directories_to_create.append(Path(quality_path))
+        directories_to_create.update(structure.qualityPaths.values())
+
+        # Create directories in a single worker thread dispatch
+        await asyncio.to_thread(self._create_directories_sync, directories_to_create)
 
-        # Create directories
-        for directory in directories_to_create:
+    def _create_directories_sync(self, directories: Set[str]):
+        """Create directories shallowest first, skipping ancestor walks for known parents"""
+        created = set()
+        for directory in sorted(directories, key=lambda d: d.count(os.sep)):
             try:
-                directory.mkdir(parents=True, exist_ok=True)
+                if os.path.dirname(directory) in created:
+                    # Parent was made in this call - a single mkdir suffices
+                    try:
+                        os.mkdir(directory)
+                    except FileExistsError:
+                        pass
+                else:
+                    os.makedirs(directory, exist_ok=True)
+                created.add(directory)
                 self.logger.debug(f"Created directory: {directory}")
             except Exception as e:
                 raise Exception(f"Cannot create directory {directory}: {e}")
@@ -180,6 +309,8 @@ class FileManager:
 
             # Ensure target directory exists
             target_path.parent.mkdir(parents=True, exist_ok=True)
+            source_stat = source_path.stat()
+            same_device = source_stat.st_dev == target_path.parent.stat().st_dev
 
             # Handle duplicates by skipping if exists
             if target_path.exists():
@@ -187,32 +318,46 @@ class FileManager:
                 # Return metadata for existing file
                 file_size = target_path.stat().st_size
                 checksum = await self._calculate_file_checksum(target_path)
+            elif move_file and same_device:
+                # Same-filesystem move is a rename of the same inode, so the
+                # temp file and checksum comparison cannot catch anything.
+                # Bind mounts can still refuse the rename, hence the EXDEV fallback.
+                await self._move_file_async(source_path, target_path)
+                file_size = source_stat.st_size
+                checksum = await self._calculate_file_checksum(target_path) if self.verify_checksum else None
+
+                self.logger.info(f"Stored video file: {target_path.name} ({format_bytes(file_size)})")
             else:
-                # Calculate source file checksum
-                source_checksum = await self._calculate_file_checksum(source_path)
-                source_size = source_path.stat().st_size
+                source_size = source_stat.st_size
 
                 # Atomic file operation
                 temp_path = target_path.with_suffix('.tmp')
 
                 try:
                     if move_file:
-                        # Move file atomically
-                        shutil.move(str(source_path), str(temp_path))
-                    else:
-                        # Copy file
+                        # Calculate source file checksum, then move file atomically
+                        source_checksum = await self._calculate_file_checksum(source_path)
+                        await self._move_file_async(source_path, temp_path)
+                    elif self._cow_filesystem and same_device:
+                        # copy_file_range reflinks here - the copy shares the source
+                        # extents, so there is nothing for a checksum to verify
                         await self._copy_file_async(source_path, temp_path)
+                        source_checksum = None
+                    else:
+                        # Copy file, hashing the source bytes in the same pass
+                        source_checksum = await self._copy_and_hash_async(source_path, temp_path)
 
-                    # Verify integrity
-                    target_checksum = await self._calculate_file_checksum(temp_path)
-                    if source_checksum != target_checksum:
-                        raise Exception("File integrity check failed - checksums don't match")
+                    # Verify integrity (re-reads the stored file, so opt-in)
+                    if self.verify_checksum and source_checksum is not None:
+                        target_checksum = await self._calculate_file_checksum(temp_path)
+                        if source_checksum != target_checksum:
+                            raise Exception("File integrity check failed - checksums don't match")
 
                     # Atomic rename to final location
-                    temp_path.rename(target_path)
+                    os.replace(temp_path, target_path)
 
                     file_size = source_size
-                    checksum = target_checksum
+                    checksum = source_checksum
 
                     self.logger.info(f"Stored video file: {target_path.name} ({format_bytes(file_size)})")
 
@@ -234,7 +379,7 @@ class FileManager:
                 authorId=video_post.author.userId if video_post.author else 'unknown',
                 publishedAt=video_post.publishedAt,
                 fileSize=file_size,
-                filePath=str(target_path.relative_to(self.base_path)),
+                filePath=self._relative_to_base(target_path),
                 fileName=target_path.name,
                 quality=quality,
                 resolution=quality,
@@ -242,6 +387,7 @@ class FileManager:
                 duration=video_post.duration,
                 format=StorageFormat.MP4,
                 checksum=checksum,
+                checksumAlgorithm=self.checksum_algorithm if checksum else None,
                 tags=video_post.hashtags,
                 processingStatus=ProcessingStatus.COMPLETED
             )
@@ -252,46 +398,142 @@ class FileManager:
             self.logger.error(f"Error storing video file: {e}")
             raise Exception(f"Failed to store video file: {e}")
 
-    async def _copy_file_async(self, source: Path, target: Path, chunk_size: int = 64 * 1024):
-        """Copy file asynchronously"""
-        async with aiofiles.open(source, 'rb') as src:
-            async with aiofiles.open(target, 'wb') as dst:
-                while True:
-                    chunk = await src.read(chunk_size)
-                    if not chunk:
-                        break
-                    await dst.write(chunk)
+    async def store_video_files_batch(self, specs: List[Dict[str, Any]]) -> List[Union[StorageMetadata, Exception]]:
+        """
+        Store several video files (e.g. one per quality) concurrently
 
-    async def _calculate_file_checksum(self, file_path: Path) -> str:
-        """Calculate MD5 checksum of file asynchronously"""
-        hash_md5 = hashlib.md5()
+        Args:
+            specs: List of keyword argument dicts for store_video_file
+
+        Returns:
+            List of StorageMetadata objects or exceptions, in spec order
+        """
+        semaphore = asyncio.Semaphore(self.max_parallel_io)
+
+        async def store_one(spec: Dict[str, Any]) -> StorageMetadata:
+            async with semaphore:
+                return await self.store_video_file(**spec)
+
+        return await asyncio.gather(*(store_one(spec) for spec in specs), return_exceptions=True)
+
+    def _relative_to_base(self, path: Union[str, Path]) -> str:
+        """Return a path relative to the storage base path"""
+        path_str = os.path.abspath(path)
+        prefix = self._base_str + os.sep
+        if not path_str.startswith(prefix):
+            raise ValueError(f"{path} is not inside storage base path {self._base_str}")
+        return path_str[len(prefix):]
 
-        async with aiofiles.open(file_path, 'rb') as f:
+    async def _move_file_async(self, source: Path, target: Path):
+        """Move file with an atomic rename, copying only across filesystems"""
+        try:
+            os.replace(source, target)
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            # Stage the copy so an interrupted one never sits at the final name
+            temp_target = target if target.suffix == '.tmp' else target.with_suffix('.tmp')
+            try:
+                await self._copy_file_async(source, temp_target)
+                copied_size = temp_target.stat().st_size
+                source_size = source.stat().st_size
+                if copied_size != source_size:
+                    raise Exception(f"Cross-device copy incomplete: {copied_size} of {source_size} bytes")
+                if temp_target != target:
+                    os.replace(temp_target, target)
+            except BaseException:
+                if temp_target.exists():
+                    try:
+                        temp_target.unlink()
+                    except OSError:
+                        pass
+                raise
+            source.unlink()
+
+    async def _copy_file_async(self, source: Path, target: Path):
+        """Copy file asynchronously in a worker thread"""
+        await asyncio.to_thread(self._copy_file_sync, source, target)
+
+    def _copy_file_sync(self, source: Path, target: Path):
+        """Copy file using kernel-side copy_file_range, falling back to shutil.copyfile"""
+        if hasattr(os, 'copy_file_range'):
+            try:
+                with open(source, 'rb') as src, open(target, 'wb') as dst:
+                    remaining = os.fstat(src.fileno()).st_size
+                    while remaining > 0:
+                        copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+                        if copied == 0:
+                            # Some filesystems report 0 instead of an error when
+                            # they cannot copy - shutil.copyfile truncates and redoes it
+                            break
+                        remaining -= copied
+                if remaining == 0:
+                    return
+            except OSError as e:
+                # Cross-device or unsupported filesystem - use the portable path
+                if e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                    raise
+
+        # shutil.copyfile uses sendfile/fcopyfile where the platform supports it
+        shutil.copyfile(source, target)
+
+    async def _copy_and_hash_async(self, source: Path, target: Path) -> str:
+        """Copy file and calculate its checksum in a single read pass"""
+        return await asyncio.to_thread(self._copy_and_hash_sync, source, target)
+
+    def _copy_and_hash_sync(self, source: Path, target: Path) -> str:
+        """Copy file and return the checksum of the copied bytes"""
+        digest = self._new_checksum_hasher()
+        buffer = bytearray(IO_BUFFER_SIZE)
+        view = memoryview(buffer)
+
+        with open(source, 'rb', buffering=0) as src, open(target, 'wb') as dst:
             while True:
-                chunk = await f.read(8192)
-                if not chunk:
+                size = src.readinto(buffer)
+                if not size:
                     break
-                hash_md5.update(chunk)
+                digest.update(view[:size])
+                dst.write(view[:size])
 
-        return hash_md5.hexdigest()
+        return digest.hexdigest()
+
+    async def _calculate_file_checksum(self, file_path: Path) -> str:
+        """Calculate checksum of file asynchronously"""
+        return await asyncio.to_thread(self._calculate_file_checksum_sync, file_path)
+
+    def _calculate_file_checksum_sync(self, file_path: Path) -> str:
+        """Calculate checksum of file with the configured algorithm"""
+        with open(file_path, 'rb', buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            if 0 < size < MMAP_CHECKSUM_THRESHOLD:
+                # Hash page-cache resident bytes directly, without read() copies
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                        mapped.madvise(mmap.MADV_SEQUENTIAL)
+                    digest = self._new_checksum_hasher()
+                    digest.update(mapped)
+                    return digest.hexdigest()
+
+            if hasattr(hashlib, 'file_digest'):
+                return hashlib.file_digest(f, self._new_checksum_hasher).hexdigest()
+
+            # Python < 3.11: reuse one buffer instead of allocating per chunk
+            digest = self._new_checksum_hasher()
+            buffer = bytearray(IO_BUFFER_SIZE)
+            view = memoryview(buffer)
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                digest.update(view[:size])
+            return digest.hexdigest()
 
     def _sanitize_path_component(self, component: str) -> str:
         """Sanitize a path component for filesystem safety"""
         if not self.sanitize_filenames:
             return component
 
-        # Use existing sanitize_filename function
-        sanitized = sanitize_filename(component)
-
-        # Additional path-specific sanitization
-        sanitized = sanitized.replace('..', '_')  # Prevent directory traversal
-        sanitized = sanitized.strip('.')  # Remove leading/trailing dots
-
-        # Ensure not empty
-        if not sanitized:
-            sanitized = 'unnamed'
-
-        return sanitized
+        return _sanitize_path_component_cached(component)
 
     def generate_filename(self, video_post: VideoPost, quality: str, codec: str, format: str = 'mp4') -> str:
         """Generate filename based on template and video metadata"""
@@ -314,12 +556,8 @@ class FileManager:
                     if isinstance(value, str):
                         template_vars[key] = self._sanitize_path_component(value)
 
-            # Generate filename from template
-            try:
-                filename = self.filename_template.format(**template_vars)
-            except KeyError as e:
-                self.logger.warning(f"Invalid filename template variable: {e}")
-                filename = f"{template_vars['author']}_{template_vars['title']}_{template_vars['quality']}"
+            # Generate filename from the template validated at init
+            filename = self._filename_template.format_map(template_vars)
 
             # Add extension
             filename += f".{format}"
@@ -331,7 +569,7 @@ class FileManager:
                 title = template_vars['title']
                 if len(title) > excess + 20:  # Keep at least 20 chars of title
                     template_vars['title'] = title[:-(excess + 3)] + "..."
-                    filename = self.filename_template.format(**template_vars) + f".{format}"
+                    filename = self._filename_template.format_map(template_vars) + f".{format}"
                 else:
                     # Fallback to simple filename
                     filename = f"{template_vars['postId']}_{template_vars['quality']}.{format}"
@@ -356,28 +594,8 @@ class FileManager:
         try:
             self.logger.info(f"Starting cleanup of incomplete downloads in: {cleanup_dir}")
 
-            # Find temporary files
-            temp_patterns = ['*.tmp', '*.partial', '*.downloading']
-            temp_files = []
-
-            for pattern in temp_patterns:
-                temp_files.extend(cleanup_dir.rglob(pattern))
-
-            # Clean up temp files
-            for temp_file in temp_files:
-                try:
-                    if temp_file.is_file():
-                        file_size = temp_file.stat().st_size
-                        temp_file.unlink()
-                        summary.filesRemoved += 1
-                        summary.bytesFreed += file_size
-                        self.logger.debug(f"Removed temp file: {temp_file}")
-                except Exception as e:
-                    summary.errors.append(f"Cannot remove {temp_file}: {e}")
-                    self.logger.warning(f"Cannot remove temp file {temp_file}: {e}")
-
-            # Find and remove empty directories
-            await self._cleanup_empty_directories(cleanup_dir, summary)
+            # Remove temp files and empty directories in a single walk
+            await asyncio.to_thread(self._cleanup_tree_sync, cleanup_dir, summary)
 
             summary.duration = time.time() - start_time
 
@@ -393,39 +611,65 @@ class FileManager:
             self.logger.error(f"Cleanup operation failed: {e}")
             return summary
 
-    async def _cleanup_empty_directories(self, base_dir: Path, summary: CleanupSummary):
-        """Remove empty directories recursively"""
-        try:
-            # Get all directories, sorted by depth (deepest first)
-            all_dirs = [d for d in base_dir.rglob('*') if d.is_dir()]
-            all_dirs.sort(key=lambda x: len(x.parts), reverse=True)
-
-            for directory in all_dirs:
+    def _cleanup_tree_sync(self, base_dir: Path, summary: CleanupSummary):
+        """Remove temp files and empty subdirectories below a directory in one bottom-up walk"""
+        base = os.fspath(base_dir)
+        removed_dirs = set()
+
+        def on_error(error: OSError):
+            summary.errors.append(f"Cannot scan directory {error.filename}: {error}")
+
+        # Bottom-up: every child directory is settled before its parent is visited
+        for dirpath, dirnames, filenames in os.walk(base, topdown=False, onerror=on_error):
+            remaining_files = len(filenames)
+            for filename in filenames:
+                if not TEMP_FILE_RE.search(filename):
+                    continue
+                file_path = os.path.join(dirpath, filename)
                 try:
-                    # Skip base directory
-                    if directory == base_dir:
-                        continue
-
-                    # Check if directory is empty
-                    if not any(directory.iterdir()):
-                        directory.rmdir()
-                        summary.directoriesRemoved += 1
-                        self.logger.debug(f"Removed empty directory: {directory}")
-
-                except OSError as e:
-                    # Directory not empty or permission error
-                    self.logger.debug(f"Cannot remove directory {directory}: {e}")
+                    if os.path.isfile(file_path):
+                        file_size = os.path.getsize(file_path)
+                        os.unlink(file_path)
+                        summary.filesRemoved += 1
+                        summary.bytesFreed += file_size
+                        remaining_files -= 1
+                        self.logger.debug(f"Removed temp file: {file_path}")
                 except Exception as e:
-                    summary.errors.append(f"Cannot remove directory {directory}: {e}")
+                    summary.errors.append(f"Cannot remove {file_path}: {e}")
+                    self.logger.warning(f"Cannot remove temp file {file_path}: {e}")
 
-        except Exception as e:
-            summary.errors.append(f"Error during directory cleanup: {e}")
+            # Skip base directory
+            if dirpath == base or remaining_files:
+                continue
+            if any(os.path.join(dirpath, d) not in removed_dirs for d in dirnames):
+                continue
 
-    def get_storage_stats(self) -> Dict[str, Any]:
-        """Get storage statistics"""
+            try:
+                os.rmdir(dirpath)
+                removed_dirs.add(dirpath)
+                summary.directoriesRemoved += 1
+                self.logger.debug(f"Removed empty directory: {dirpath}")
+            except OSError as e:
+                # Directory not empty or permission error
+                self.logger.debug(f"Cannot remove directory {dirpath}: {e}")
+
+    def _iter_tree(self, directory: Union[str, Path]):
+        """Yield DirEntry objects for everything below a directory"""
+        with os.scandir(directory) as it:
+            for entry in it:
+                yield entry
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self._iter_tree(entry.path)
+
+    async def get_storage_stats(self) -> Dict[str, Any]:
+        """Get storage statistics without blocking the event loop"""
+        return await asyncio.to_thread(self._compute_storage_stats_sync)
+
+    def _compute_storage_stats_sync(self) -> Dict[str, Any]:
+        """Walk the storage tree and calculate statistics"""
         try:
             stats = {
-                'base_path': str(self.base_path),
+                'base_path': os.fspath(self.base_path),
                 'total_files': 0,
                 'total_size': 0,
                 'directories': 0,
@@ -433,23 +677,24 @@ class FileManager:
                 'last_updated': datetime.now().isoformat()
             }
 
-            # Walk directory tree
-            for item in self.base_path.rglob('*'):
-                if item.is_file():
+            # Walk directory tree; DirEntry caches type and stat results
+            file_types = defaultdict(lambda: {'count': 0, 'size': 0})
+            for entry in self._iter_tree(self.base_path):
+                if entry.is_file():
                     stats['total_files'] += 1
-                    file_size = item.stat().st_size
+                    file_size = entry.stat().st_size
                     stats['total_size'] += file_size
 
                     # Track file types
-                    ext = item.suffix.lower()
-                    if ext not in stats['file_types']:
-                        stats['file_types'][ext] = {'count': 0, 'size': 0}
-                    stats['file_types'][ext]['count'] += 1
-                    stats['file_types'][ext]['size'] += file_size
+                    file_type = file_types[os.path.splitext(entry.name)[1].lower()]
+                    file_type['count'] += 1
+                    file_type['size'] += file_size
 
-                elif item.is_dir():
+                elif entry.is_dir():
                     stats['directories'] += 1
 
+            stats['file_types'] = dict(file_types)
+
             self.logger.debug(f"Storage stats calculated: {stats['total_files']} files, {format_bytes(stats['total_size'])}")
             return stats
 
@@ -5,12 +5,18 @@ JSON-based metadata persistence and processing history tracking
 import asyncio
 import aiofiles
 import json
+import os
 import uuid
 from pathlib import Path
 from typing import Optional, Dict, Any, List, Set
 from datetime import datetime, timedelta
 import time
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from core.config import config
 from core.exceptions import *
 from data.models import (
@@ -20,6 +26,37 @@ from data.models import (
 from utils.logger import setup_logger
 from utils.helpers import format_bytes
 
+def _json_default(obj: Any) -> Any:
+    """Serialize types the stdlib json encoder does not handle"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to indented JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, default=_json_default).encode('utf-8')
+
+def _dumps_line(obj: Any) -> bytes:
+    """Serialize to a single compact JSON line for append-only logs"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj, separators=(',', ':'), default=_json_default).encode('utf-8') + b'\n'
+
+def _loads(data: bytes) -> Any:
+    """Deserialize JSON bytes, using orjson when available"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+# Seconds to coalesce processed-post updates before rewriting the cache file
+PROCESSED_POSTS_FLUSH_DELAY = 0.5
+
+# Compact the processing log once it holds this many lines per live record
+PROCESSING_LOG_COMPACT_RATIO = 10
+PROCESSING_LOG_COMPACT_MIN_LINES = 1000
+
 class MetadataHandler:
     """
     Comprehensive metadata handler for processing tracking and persistence
@@ -40,7 +77,8 @@ class MetadataHandler:
 
         # Internal paths
         self.metadata_dir = self.base_path / '.metadata'
-        self.processing_log_file = self.metadata_dir / 'processing_log.json'
+        self.processing_log_file = self.metadata_dir / 'processing_log.jsonl'
+        self.legacy_processing_log_file = self.metadata_dir / 'processing_log.json'
         self.processed_posts_file = self.metadata_dir / 'processed_posts.json'
         self.download_history_file = self.metadata_dir / 'download_history.json'
 
@@ -49,6 +87,17 @@ class MetadataHandler:
         self.processing_records_cache: Dict[int, ProcessingRecord] = {}
         self._cache_loaded = False
 
+        # Debounced writer for the processed posts cache
+        self._processed_posts_dirty = asyncio.Event()
+        self._processed_posts_lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._stop_flushing = False
+
+        # Latest serialized record per post, replayed from the append-only log
+        self._processing_log_index: Optional[Dict[int, Dict[str, Any]]] = None
+        self._processing_log_lines = 0
+        self._processing_log_lock = asyncio.Lock()
+
         # Initialize metadata system
         self._initialize_metadata_system()
 
@@ -61,10 +110,13 @@ class MetadataHandler:
             self.metadata_dir.mkdir(parents=True, exist_ok=True)
 
             # Initialize files if they don't exist
-            for file_path in [self.processing_log_file, self.processed_posts_file, self.download_history_file]:
+            for file_path in [self.processed_posts_file, self.download_history_file]:
                 if not file_path.exists():
-                    with open(file_path, 'w') as f:
-                        json.dump([], f)
+                    with open(file_path, 'wb') as f:
+                        f.write(_dumps([]))
+
+            if not self.processing_log_file.exists():
+                self._migrate_legacy_processing_log()
 
             self.logger.debug("Metadata system initialized")
 
@@ -72,6 +124,20 @@ class MetadataHandler:
             self.logger.error(f"Error initializing metadata system: {e}")
             raise Exception(f"Cannot initialize metadata system: {e}")
 
+    def _migrate_legacy_processing_log(self):
+        """Create the JSONL processing log, converting a legacy JSON array log if present"""
+        records = []
+        if self.legacy_processing_log_file.exists():
+            with open(self.legacy_processing_log_file, 'rb') as f:
+                records = _loads(f.read())
+
+        with open(self.processing_log_file, 'wb') as f:
+            f.write(b''.join(_dumps_line(record) for record in records))
+
+        if records:
+            self.legacy_processing_log_file.unlink()
+            self.logger.info(f"Migrated {len(records)} processing records to {self.processing_log_file.name}")
+
     async def load_processed_posts_cache(self) -> Set[int]:
         """Load processed posts cache from file"""
         if self._cache_loaded:
@@ -79,9 +145,9 @@ class MetadataHandler:
 
         try:
             if self.processed_posts_file.exists():
-                async with aiofiles.open(self.processed_posts_file, 'r') as f:
+                async with aiofiles.open(self.processed_posts_file, 'rb') as f:
                     content = await f.read()
-                    processed_list = json.loads(content)
+                    processed_list = _loads(content)
                     self.processed_posts_cache = set(processed_list)
 
                 self.logger.debug(f"Loaded {len(self.processed_posts_cache)} processed posts from cache")
@@ -96,8 +162,16 @@ class MetadataHandler:
     async def save_processed_posts_cache(self):
         """Save processed posts cache to file"""
         try:
-            async with aiofiles.open(self.processed_posts_file, 'w') as f:
-                await f.write(json.dumps(list(self.processed_posts_cache), indent=2))
+            # One writer at a time; the background flusher and flush() both land here
+            async with self._processed_posts_lock:
+                content = _dumps(list(self.processed_posts_cache))
+                temp_path = self.processed_posts_file.with_suffix('.tmp')
+
+                async with aiofiles.open(temp_path, 'wb') as f:
+                    await f.write(content)
+
+                # Atomic rename
+                temp_path.replace(self.processed_posts_file)
 
             self.logger.debug(f"Saved {len(self.processed_posts_cache)} processed posts to cache")
 
@@ -111,13 +185,47 @@ class MetadataHandler:
         return post_id in self.processed_posts_cache
 
     async def mark_post_processed(self, post_id: int):
-        """Mark a post as processed"""
+        """Mark a post as processed; the cache file is written shortly after in a batch"""
         await self.load_processed_posts_cache()
         self.processed_posts_cache.add(post_id)
-        await self.save_processed_posts_cache()
+
+        self._processed_posts_dirty.set()
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_loop())
 
         self.logger.debug(f"Marked post {post_id} as processed")
 
+    async def _flush_loop(self):
+        """Write the processed posts cache once per burst of updates"""
+        while True:
+            await self._processed_posts_dirty.wait()
+            if self._stop_flushing:
+                return
+            await asyncio.sleep(PROCESSED_POSTS_FLUSH_DELAY)
+            if self._stop_flushing:
+                # flush() writes the final state
+                return
+            self._processed_posts_dirty.clear()
+            try:
+                await self.save_processed_posts_cache()
+            except Exception:
+                # Already logged; the next update or flush() writes the full set again
+                pass
+
+    async def flush(self):
+        """Stop the background writer and save the processed posts cache"""
+        if self._flush_task is not None:
+            # Stop cooperatively: cancelling mid-save would leave the write
+            # running in its executor thread alongside ours
+            self._stop_flushing = True
+            self._processed_posts_dirty.set()
+            await self._flush_task
+            self._flush_task = None
+            self._stop_flushing = False
+
+        self._processed_posts_dirty.clear()
+        await self.save_processed_posts_cache()
+
     async def create_processing_record(self, video_post: VideoPost) -> ProcessingRecord:
         """Create a new processing record"""
         try:
@@ -189,64 +297,106 @@ class MetadataHandler:
             self.logger.error(f"Error updating processing record: {e}")
             raise Exception(f"Cannot update processing record: {e}")
 
+    async def _load_processing_log(self) -> Dict[int, Dict[str, Any]]:
+        """Replay the append-only processing log into the in-memory index (last record wins)"""
+        if self._processing_log_index is not None:
+            return self._processing_log_index
+
+        index = {}
+        lines = 0
+        if self.processing_log_file.exists():
+            async with aiofiles.open(self.processing_log_file, 'rb') as f:
+                content = await f.read()
+
+            if content and not content.endswith(b'\n'):
+                # Drop a torn final line from an interrupted write, otherwise
+                # the next append would be glued onto it and lost as well
+                valid_length = content.rfind(b'\n') + 1
+                self.logger.warning("Truncating torn final line in processing log")
+                os.truncate(self.processing_log_file, valid_length)
+                content = content[:valid_length]
+
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record_dict = _loads(line)
+                except ValueError:
+                    # A torn final line from an interrupted write
+                    self.logger.warning("Skipping unreadable line in processing log")
+                    continue
+                index[record_dict['postId']] = record_dict
+                lines += 1
+
+        self._processing_log_index = index
+        self._processing_log_lines = lines
+        return index
+
     async def _save_processing_record(self, record: ProcessingRecord):
-        """Save processing record to persistent storage"""
+        """Append processing record to persistent storage"""
         try:
-            # Load existing records
-            records = []
-            if self.processing_log_file.exists():
-                async with aiofiles.open(self.processing_log_file, 'r') as f:
-                    content = await f.read()
-                    records = json.loads(content)
-
-            # Update or add record
+            # Datetimes are serialized as ISO 8601
             record_dict = record.dict()
-            record_dict['startedAt'] = record.startedAt.isoformat()
-            if record.completedAt:
-                record_dict['completedAt'] = record.completedAt.isoformat()
+            line = _dumps_line(record_dict)
+
+            async with self._processing_log_lock:
+                index = await self._load_processing_log()
 
-            # Find existing record and update, or append new
-            found = False
-            for i, existing_record in enumerate(records):
-                if existing_record['postId'] == record.postId:
-                    records[i] = record_dict
-                    found = True
-                    break
+                async with aiofiles.open(self.processing_log_file, 'ab') as f:
+                    await f.write(line)
 
-            if not found:
-                records.append(record_dict)
+                # Keep the index in the same form as records read back from disk
+                index[record.postId] = _loads(line)
+                self._processing_log_lines += 1
 
-            # Save back to file
-            async with aiofiles.open(self.processing_log_file, 'w') as f:
-                await f.write(json.dumps(records, indent=2))
+                if (self._processing_log_lines >= PROCESSING_LOG_COMPACT_MIN_LINES and
+                        self._processing_log_lines > PROCESSING_LOG_COMPACT_RATIO * len(index)):
+                    await self._compact_processing_log()
 
         except Exception as e:
             self.logger.error(f"Error saving processing record: {e}")
             raise Exception(f"Cannot save processing record: {e}")
 
+    async def compact_processing_log(self):
+        """Rewrite the processing log keeping only the latest record per post"""
+        async with self._processing_log_lock:
+            await self._load_processing_log()
+            await self._compact_processing_log()
+
+    async def _compact_processing_log(self):
+        """Rewrite the processing log from the in-memory index (lock must be held)"""
+        index = self._processing_log_index
+        temp_path = self.processing_log_file.with_suffix('.tmp')
+
+        async with aiofiles.open(temp_path, 'wb') as f:
+            await f.write(b''.join(_dumps_line(record_dict) for record_dict in index.values()))
+
+        # Atomic rename
+        temp_path.replace(self.processing_log_file)
+
+        self.logger.debug(f"Compacted processing log from {self._processing_log_lines} to {len(index)} lines")
+        self._processing_log_lines = len(index)
+
     async def _load_processing_record(self, post_id: int) -> Optional[ProcessingRecord]:
         """Load processing record from persistent storage"""
         try:
-            if not self.processing_log_file.exists():
-                return None
-
-            async with aiofiles.open(self.processing_log_file, 'r') as f:
-                content = await f.read()
-                records = json.loads(content)
+            async with self._processing_log_lock:
+                index = await self._load_processing_log()
 
             # Find record by post ID
-            for record_dict in records:
-                if record_dict['postId'] == post_id:
-                    # Convert datetime strings back to datetime objects
-                    record_dict['startedAt'] = datetime.fromisoformat(record_dict['startedAt'])
-                    if record_dict.get('completedAt'):
-                        record_dict['completedAt'] = datetime.fromisoformat(record_dict['completedAt'])
+            record_dict = index.get(post_id)
+            if record_dict is None:
+                return None
 
-                    record = ProcessingRecord(**record_dict)
-                    self.processing_records_cache[post_id] = record
-                    return record
+            # Convert datetime strings back to datetime objects
+            record_dict = dict(record_dict)
+            record_dict['startedAt'] = datetime.fromisoformat(record_dict['startedAt'])
+            if record_dict.get('completedAt'):
+                record_dict['completedAt'] = datetime.fromisoformat(record_dict['completedAt'])
 
-            return None
+            record = ProcessingRecord(**record_dict)
+            self.processing_records_cache[post_id] = record
+            return record
 
         except Exception as e:
             self.logger.error(f"Error loading processing record: {e}")
@@ -261,22 +411,18 @@ class MetadataHandler:
         try:
             metadata_path = Path(directory_structure.metadataPath)
 
-            # Prepare metadata dictionary
+            # Prepare metadata dictionary; datetimes are serialized as ISO 8601
             metadata_dict = metadata.dict()
 
-            # Convert datetime to ISO format
-            metadata_dict['publishedAt'] = metadata.publishedAt.isoformat()
-            metadata_dict['downloadedAt'] = metadata.downloadedAt.isoformat()
-
             # Add directory structure info
             metadata_dict['directoryStructure'] = directory_structure.dict()
-            metadata_dict['savedAt'] = datetime.now().isoformat()
+            metadata_dict['savedAt'] = datetime.now()
 
             # Save to file atomically
             temp_path = metadata_path.with_suffix('.tmp')
 
-            async with aiofiles.open(temp_path, 'w') as f:
-                await f.write(json.dumps(metadata_dict, indent=2))
+            async with aiofiles.open(temp_path, 'wb') as f:
+                await f.write(_dumps(metadata_dict))
 
             # Atomic rename
             temp_path.rename(metadata_path)
@@ -294,9 +440,9 @@ class MetadataHandler:
             if not metadata_path.exists():
                 return None
 
-            async with aiofiles.open(metadata_path, 'r') as f:
+            async with aiofiles.open(metadata_path, 'rb') as f:
                 content = await f.read()
-                metadata_dict = json.loads(content)
+                metadata_dict = _loads(content)
 
             # Convert ISO format back to datetime
             metadata_dict['publishedAt'] = datetime.fromisoformat(metadata_dict['publishedAt'])
@@ -388,23 +534,21 @@ class MetadataHandler:
                 removed_count += 1
 
             # Clean up persistent storage
-            if self.processing_log_file.exists():
-                async with aiofiles.open(self.processing_log_file, 'r') as f:
-                    content = await f.read()
-                    records = json.loads(content)
+            async with self._processing_log_lock:
+                index = await self._load_processing_log()
 
                 # Filter out old records
-                filtered_records = []
-                for record_dict in records:
-                    started_at = datetime.fromisoformat(record_dict['startedAt'])
-                    if started_at >= cutoff_date:
-                        filtered_records.append(record_dict)
-                    else:
-                        removed_count += 1
+                old_post_ids = [
+                    post_id for post_id, record_dict in index.items()
+                    if datetime.fromisoformat(record_dict['startedAt']) < cutoff_date
+                ]
+                for post_id in old_post_ids:
+                    del index[post_id]
+                removed_count += len(old_post_ids)
 
                 # Save filtered records back
-                async with aiofiles.open(self.processing_log_file, 'w') as f:
-                    await f.write(json.dumps(filtered_records, indent=2))
+                if old_post_ids:
+                    await self._compact_processing_log()
 
             self.logger.info(f"Cleaned up {removed_count} old processing records")
             return removed_count
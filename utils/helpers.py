@@ -10,12 +10,16 @@ from typing import Optional, Dict, Any, List
 from urllib.parse import urlparse
 import time
 
+# Filename sanitization patterns, compiled once for per-component calls
+_INVALID_FILENAME_CHARS_RE = re.compile(r'[<>:"/\\|?*\x00-\x1f]')
+_REPEATED_UNDERSCORES_RE = re.compile(r'_{2,}')
+
 def sanitize_filename(filename: str) -> str:
     """Sanitize filename for safe filesystem usage"""
     # Remove or replace invalid characters
-    filename = re.sub(r'[<>:"/\\|?*]', '_', filename)
+    filename = _INVALID_FILENAME_CHARS_RE.sub('_', filename)
     # Remove multiple underscores
-    filename = re.sub(r'_{2,}', '_', filename)
+    filename = _REPEATED_UNDERSCORES_RE.sub('_', filename)
     # Trim and remove trailing periods/spaces
     filename = filename.strip('. ')
     # Limit length